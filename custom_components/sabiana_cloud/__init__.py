@@ -1,22 +1,44 @@
 from __future__ import annotations
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
 
-from .const import DOMAIN, PLATFORMS
+from .const import DOMAIN, PLATFORMS, CONF_SCHEDULES
 from .coordinator import SabianaCoordinator
+from .schedule import SabianaScheduler
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = SabianaCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await coordinator.client.async_close()
+        raise
+
+    # HA non scarica le entry allo stop: la sessione dedicata va chiusa anche su CLOSE
+    entry.async_on_unload(coordinator.client.async_close)
+
+    async def _async_close_client(_event: Event) -> None:
+        await coordinator.client.async_close()
+
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_client))
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    scheduler = SabianaScheduler(hass, coordinator, entry.options.get(CONF_SCHEDULES, {}))
+    scheduler.async_start()
+    entry.async_on_unload(scheduler.async_stop)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
@@ -1,18 +1,107 @@
 from __future__ import annotations
-from typing import Any, Dict, List
-from aiohttp import ClientSession, ClientTimeout
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.ssl import get_default_context
+
+CONNECTION_LIMIT_PER_HOST = 4
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 60  # seconds
+GET_CACHE_TTL = 2.0  # seconds
 
 class SabianaApiError(Exception):
     pass
 
+def create_session() -> ClientSession:
+    """Sessione dedicata all'host cloud: keep-alive, cache DNS e limite per host.
+
+    Contesto SSL, User-Agent e serializzazione JSON sono gli stessi della
+    sessione condivisa di HA; cambia solo la configurazione del pool.
+    """
+    connector = TCPConnector(
+        ssl=get_default_context(),
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return ClientSession(connector=connector, json_serialize=json_dumps, headers={USER_AGENT: SERVER_SOFTWARE})
+
 class SabianaApiClient:
-    def __init__(self, session: ClientSession, base_url: str, api_key: str, *, timeout: int = 15) -> None:
-        self._session = session
+    """Client per le API Sabiana Cloud.
+
+    Se ``session`` e' None il client crea e possiede una sessione dedicata
+    (vedi ``create_session``), da chiudere con ``async_close``.
+
+    Le GET concorrenti sullo stesso path condividono un'unica richiesta
+    (single-flight); con ``cache_ttl`` > 0 il risultato resta valido per quel
+    numero di secondi. Ogni POST invalida la cache. I risultati sono
+    condivisi tra i chiamanti e vanno trattati in sola lettura.
+    """
+
+    def __init__(self, session: Optional[ClientSession], base_url: str, api_key: str, *, timeout: int = 15,
+                 cache_ttl: float = 0.0) -> None:
+        self._owns_session = session is None
+        self._session = session or create_session()
         self._base = base_url.rstrip("/")
-        self._headers = {"accept": "application/json", "auth": api_key}
+        self._headers = {"accept": "application/json", "accept-encoding": "gzip, deflate", "auth": api_key}
+        self._post_headers = {**self._headers, "Content-Type": "application/json"}
         self._timeout = ClientTimeout(total=timeout)
+        self._cache_ttl = cache_ttl
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._flights: Set[asyncio.Future] = set()
+        self._epoch = 0
+
+    async def async_close(self) -> None:
+        # anche le richieste staccate da _invalidate possono essere ancora in corso
+        for fut in self._flights:
+            fut.cancel()
+        self._flights.clear()
+        self._inflight.clear()
+        self._cache.clear()
+        if self._owns_session and not self._session.closed:
+            await self._session.close()
 
     async def _get_json(self, path: str) -> Any:
+        if self._cache_ttl > 0:
+            hit = self._cache.get(path)
+            if hit and time.monotonic() - hit[0] < self._cache_ttl:
+                return hit[1]
+
+        fut = self._inflight.get(path)
+        if fut is None:
+            fut = asyncio.ensure_future(self._fetch_json(path))
+            self._inflight[path] = fut
+            self._flights.add(fut)
+            fut.add_done_callback(lambda f, p=path: self._flight_done(p, f))
+        # shield: un chiamante cancellato non deve annullare la richiesta degli altri
+        return await asyncio.shield(fut)
+
+    def _flight_done(self, path: str, fut: asyncio.Future) -> None:
+        self._flights.discard(fut)
+        if self._inflight.get(path) is fut:
+            del self._inflight[path]
+        if not fut.cancelled():
+            fut.exception()  # evita "exception was never retrieved" se nessuno attende piu'
+
+    async def _fetch_json(self, path: str) -> Any:
+        epoch = self._epoch
+        data = await self._request_json(path)
+        if self._cache_ttl > 0 and epoch == self._epoch:
+            self._cache[path] = (time.monotonic(), data)
+        return data
+
+    def _invalidate(self) -> None:
+        """Dopo un comando le GET successive devono rileggere lo stato dal cloud."""
+        self._epoch += 1
+        self._cache.clear()
+        self._inflight.clear()
+
+    async def _request_json(self, path: str) -> Any:
         url = f"{self._base}{path}"
         async with self._session.get(url, headers=self._headers, timeout=self._timeout) as resp:
             if resp.status == 403:
@@ -24,13 +113,14 @@ class SabianaApiClient:
 
     async def _post_json(self, path: str, payload: Dict[str, Any]) -> Any:
         url = f"{self._base}{path}"
-        async with self._session.post(url, headers={**self._headers, "Content-Type": "application/json"},
+        async with self._session.post(url, headers=self._post_headers,
                                       json=payload, timeout=self._timeout) as resp:
             if resp.status == 403:
                 raise SabianaApiError("Forbidden (API key o rate limit)")
             if resp.status == 404:
                 raise SabianaApiError("Endpoint non trovato")
             resp.raise_for_status()
+            self._invalidate()
             if resp.content_length and resp.content_type == "application/json":
                 return await resp.json()
             return None
@@ -3,7 +3,6 @@ from typing import List, Optional
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
     HVACMode,
@@ -12,7 +11,7 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.const import UnitOfTemperature
 from .const import DOMAIN, DEFAULT_FAN_MAP
-from .coordinator import SabianaCoordinator
+from .coordinator import SabianaCoordinator, SabianaUnitEntity, UnitView, clamp_setpoint, command_changes
 
 HVAC_MAP_API_TO_HA = {
     "heating": HVACMode.HEAT,
@@ -29,10 +28,10 @@ HVAC_MAP_HA_TO_API = {
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     coordinator: SabianaCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities: List[SabianaClimate] = [SabianaClimate(coordinator, u) for u in coordinator.data.get("units", [])]
+    entities: List[SabianaClimate] = [SabianaClimate(coordinator, u) for u in coordinator.data.units]
     async_add_entities(entities, update_before_add=True)
 
-class SabianaClimate(CoordinatorEntity, ClimateEntity):
+class SabianaClimate(SabianaUnitEntity, ClimateEntity):
     _attr_supported_features = (
         ClimateEntityFeature.TARGET_TEMPERATURE
         | ClimateEntityFeature.FAN_MODE
@@ -41,8 +40,8 @@ class SabianaClimate(CoordinatorEntity, ClimateEntity):
     _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT, HVACMode.COOL, HVACMode.AUTO, HVACMode.FAN_ONLY]
     _attr_fan_modes = [FAN_AUTO, "low", "medium", "high"]
 
-    def __init__(self, coordinator: SabianaCoordinator, unit: dict) -> None:
-        super().__init__(coordinator)
+    def __init__(self, coordinator: SabianaCoordinator, unit: UnitView) -> None:
+        super().__init__(coordinator, unit.get("groupId"), unit.get("address"))
         self._unit = unit
         self._address = unit.get("address")
         self._group_id = unit.get("groupId")
@@ -61,28 +60,15 @@ class SabianaClimate(CoordinatorEntity, ClimateEntity):
         )
 
 
-    def _current_unit(self) -> dict:
-        u = self.coordinator.data.get("units", [])
-        return next((x for x in u if x.get("address") == self._address and x.get("groupId") == self._group_id), self._unit)
+    def _current_unit(self) -> UnitView:
+        return self.coordinator.data.unit(self._group_id, self._address) or self._unit
 
     @property
-    def _v(self) -> dict:
+    def _v(self) -> UnitView:
         return (self._current_unit().get("ventUnit") or {})
 
     def _clamp(self, value: float, v: dict) -> float:
-        mode_api = (v.get("mode") or "").lower()
-        if mode_api == "heating":
-            mn, mx = v.get("setPointHeatingMin"), v.get("setPointHeatingMax")
-        elif mode_api == "cooling":
-            mn, mx = v.get("setPointCoolingMin"), v.get("setPointCoolingMax")
-        else:
-            mn, mx = v.get("setPointHeatingMin"), v.get("setPointCoolingMax")
-        try:
-            if mn is not None: value = max(value, float(mn))
-            if mx is not None: value = min(value, float(mx))
-        except Exception:
-            pass
-        return value
+        return clamp_setpoint(value, v, (v.get("mode") or "").lower())
 
     @property
     def hvac_mode(self) -> HVACMode:
@@ -167,21 +153,7 @@ class SabianaClimate(CoordinatorEntity, ClimateEntity):
             "setPoint": self.target_temperature or v.get("setPoint") or v.get("setPointHeating") or v.get("setPointCooling") or 22.0,
         }
 
-        self.coordinator.mark_pending(self._group_id, self._address, {
-            "on": payload["on"],
-            "mode": payload["mode"],
-            "fan": payload["fan"],
-            "setPoint": payload["setPoint"],
-        })
-
-        v.update({"on": on, "mode": api_mode})
-        self._poke_local_cache(v)
-        self.async_write_ha_state()
-
-        await self.coordinator.client.cmd_vent(self._address, payload)
-        v.update({"on": on, "mode": api_mode})
-        self._poke_local_cache(v)
-        self.async_write_ha_state()
+        self._poke_local_cache(command_changes(payload))
 
         await self.coordinator.client.cmd_vent(self._address, payload)
 
@@ -195,9 +167,7 @@ class SabianaClimate(CoordinatorEntity, ClimateEntity):
             "setPoint": self.target_temperature or v.get("setPoint") or v.get("setPointHeating") or v.get("setPointCooling") or 22.0,
         }
 
-        v.update({"fan": api_fan})
-        self._poke_local_cache(v)
-        self.async_write_ha_state()
+        self._poke_local_cache(command_changes(payload))
 
         await self.coordinator.client.cmd_vent(self._address, payload)
 
@@ -216,29 +186,11 @@ class SabianaClimate(CoordinatorEntity, ClimateEntity):
             "setPoint": new_temp,
         }
 
-        mode_api = (v.get("mode") or "").lower()
-        if mode_api == "heating":
-            v["setPointHeating"] = new_temp
-        elif mode_api == "cooling":
-            v["setPointCooling"] = new_temp
-        else:
-            v["setPoint"] = new_temp
-
-        self._poke_local_cache(v)
-        self.async_write_ha_state()
+        self._poke_local_cache(command_changes(payload))
 
         await self.coordinator.client.cmd_vent(self._address, payload)
 
 
-    def _poke_local_cache(self, new_v: dict) -> None:
-        """Aggiorna la cache dell'unit corrente nel coordinator."""
-        units = self.coordinator.data.get("units", [])
-        for i, u in enumerate(units):
-            if u.get("address") == self._address and u.get("groupId") == self._group_id:
-                merged = dict(u)
-                vv = dict(u.get("ventUnit") or {})
-                vv.update(new_v)
-                merged["ventUnit"] = vv
-                units[i] = merged
-                break
-
+    def _poke_local_cache(self, changes: dict) -> None:
+        """Pubblica un nuovo snapshot del coordinator con le modifiche ottimistiche (pending)."""
+        self.coordinator.async_apply_optimistic(self._group_id, self._address, changes)
@@ -4,6 +4,7 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 from .const import (
     DOMAIN,
     CONF_API_KEY,
@@ -13,10 +14,12 @@ from .const import (
     CONF_SETPOINT_STRATEGY,
     CONF_FAN_MAP,
     CONF_DEBUG,
+    CONF_SCHEDULES,
     DEFAULT_BASE_URL,
     DEFAULT_FAN_MAP,
     DEFAULT_SCAN_INTERVAL,
 )
+from .schedule import validate_program
 
 USER_SCHEMA = vol.Schema({
     vol.Required(CONF_API_KEY): str,
@@ -27,10 +30,27 @@ OPTIONS_SCHEMA = vol.Schema({
     vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
     vol.Optional(CONF_TEMPERATURE_SOURCE, default="t1"): vol.In(["t1", "t3"]),
     vol.Optional(CONF_SETPOINT_STRATEGY, default="single"): vol.In(["single", "dual"]),
-    vol.Optional(CONF_FAN_MAP, default=DEFAULT_FAN_MAP): dict,
+    vol.Optional(CONF_FAN_MAP, default=DEFAULT_FAN_MAP): selector.ObjectSelector(),
     vol.Optional(CONF_DEBUG, default=False): bool,
+    vol.Optional(CONF_SCHEDULES, default={}): selector.ObjectSelector(),
 })
 
+def _validate_options(user_input: Dict[str, Any]) -> Dict[str, str]:
+    errors: Dict[str, str] = {}
+    if not isinstance(user_input.get(CONF_FAN_MAP, {}), dict):
+        errors[CONF_FAN_MAP] = "invalid_fan_map"
+    schedules = user_input.get(CONF_SCHEDULES) or {}
+    if not isinstance(schedules, dict):
+        errors[CONF_SCHEDULES] = "invalid_schedule"
+        return errors
+    for program in schedules.values():
+        try:
+            validate_program(program)
+        except vol.Invalid:
+            errors[CONF_SCHEDULES] = "invalid_schedule"
+            break
+    return errors
+
 class SabianaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -60,8 +80,12 @@ class SabianaOptionsFlow(config_entries.OptionsFlow):
         self.entry = entry
 
     async def async_step_init(self, user_input: Dict[str, Any] | None = None) -> FlowResult:
+        errors: Dict[str, str] = {}
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            errors = _validate_options(user_input)
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
         current = {
             CONF_SCAN_INTERVAL: self.entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
@@ -69,11 +93,14 @@ class SabianaOptionsFlow(config_entries.OptionsFlow):
             CONF_SETPOINT_STRATEGY: self.entry.options.get(CONF_SETPOINT_STRATEGY, "single"),
             CONF_FAN_MAP: self.entry.options.get(CONF_FAN_MAP, DEFAULT_FAN_MAP),
             CONF_DEBUG: self.entry.options.get(CONF_DEBUG, False),
+            CONF_SCHEDULES: self.entry.options.get(CONF_SCHEDULES, {}),
+            **(user_input or {}),
         }
         return self.async_show_form(step_id="init", data_schema=vol.Schema({
             vol.Optional(CONF_SCAN_INTERVAL, default=current[CONF_SCAN_INTERVAL]): int,
             vol.Optional(CONF_TEMPERATURE_SOURCE, default=current[CONF_TEMPERATURE_SOURCE]): vol.In(["t1", "t3"]),
             vol.Optional(CONF_SETPOINT_STRATEGY, default=current[CONF_SETPOINT_STRATEGY]): vol.In(["single", "dual"]),
-            vol.Optional(CONF_FAN_MAP, default=current[CONF_FAN_MAP]): dict,
+            vol.Optional(CONF_FAN_MAP, default=current[CONF_FAN_MAP]): selector.ObjectSelector(),
             vol.Optional(CONF_DEBUG, default=current[CONF_DEBUG]): bool,
-        }))
+            vol.Optional(CONF_SCHEDULES, default=current[CONF_SCHEDULES]): selector.ObjectSelector(),
+        }), errors=errors)
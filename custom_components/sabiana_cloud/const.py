@@ -9,5 +9,6 @@ CONF_TEMPERATURE_SOURCE = "temperature_source"
 CONF_SETPOINT_STRATEGY = "setpoint_strategy"
 CONF_FAN_MAP = "fan_map"
 CONF_DEBUG = "debug"
+CONF_SCHEDULES = "schedules"
 DEFAULT_FAN_MAP = {"auto": "auto", "V1": "low", "V2": "medium", "V3": "high"}
 
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import logging
 import time
+from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Any, Dict, List, Tuple
-from homeassistant.core import HomeAssistant
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator, UpdateFailed
 from .const import (
     DOMAIN,
     CONF_API_KEY,
@@ -16,14 +17,112 @@ from .const import (
     DEFAULT_BASE_URL,
     DEFAULT_SCAN_INTERVAL,
 )
-from .api import SabianaApiClient, SabianaApiError
+from .api import GET_CACHE_TTL, SabianaApiClient, SabianaApiError
 
 _LOGGER = logging.getLogger(__name__)
 
 def _unit_key(group_id: Any, address: Any) -> Tuple[Any, Any]:
     return (group_id, address)
 
-class SabianaCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+UnitView = Mapping[str, Any]
+
+def _freeze(value: Any) -> Any:
+    """Copia profonda immutabile: dict -> MappingProxyType, list -> tuple."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def thaw(value: Any) -> Any:
+    """Copia modificabile (e serializzabile) di un valore dello snapshot."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+@dataclass(frozen=True)
+class SabianaSnapshot:
+    """Snapshot immutabile e versionato dei dati del coordinator.
+
+    Ogni aggiornamento (polling o ottimistico) produce un nuovo snapshot con
+    ``generation`` maggiore; le unit non toccate sono condivise per riferimento
+    con lo snapshot precedente e mantengono la propria generation, tenuta in
+    ``_generations`` accanto all'indice. Unit e gruppi sono copie profonde
+    immutabili (``MappingProxyType``/tuple) dei dati dell'API: non condividono
+    oggetti con la cache del client. Usare ``thaw`` per ottenerne una copia
+    modificabile.
+    """
+
+    generation: int = 0
+    groups: Tuple[UnitView, ...] = ()
+    units: Tuple[UnitView, ...] = ()
+    _index: Mapping[Tuple[Any, Any], int] = field(default_factory=lambda: MappingProxyType({}), repr=False)
+    _generations: Mapping[Tuple[Any, Any], int] = field(default_factory=lambda: MappingProxyType({}), repr=False)
+
+    @classmethod
+    def build(cls, generation: int, groups: Tuple[UnitView, ...], units: Tuple[UnitView, ...],
+              generations: Dict[Tuple[Any, Any], int]) -> "SabianaSnapshot":
+        index = {_unit_key(u.get("groupId"), u.get("address")): i for i, u in enumerate(units)}
+        return cls(generation=generation, groups=groups, units=units,
+                   _index=MappingProxyType(index), _generations=MappingProxyType(generations))
+
+    def unit(self, group_id: Any, address: Any) -> Optional[UnitView]:
+        i = self._index.get(_unit_key(group_id, address))
+        return None if i is None else self.units[i]
+
+    def unit_generation(self, group_id: Any, address: Any) -> int:
+        """Generation dell'ultima modifica della unit (-1 se assente)."""
+        return self._generations.get(_unit_key(group_id, address), -1)
+
+    def with_unit_changes(self, group_id: Any, address: Any, changes: Dict[str, Any]) -> "SabianaSnapshot":
+        """Nuovo snapshot con ``changes`` fuse nel ventUnit di una sola unit."""
+        key = _unit_key(group_id, address)
+        i = self._index.get(key)
+        if i is None:
+            return self
+        merged = thaw(self.units[i])
+        merged["ventUnit"].update(changes)
+        generation = self.generation + 1
+        units = self.units[:i] + (_freeze(merged),) + self.units[i + 1:]
+        generations = dict(self._generations)
+        generations[key] = generation
+        return SabianaSnapshot(generation=generation, groups=self.groups, units=units,
+                               _index=self._index, _generations=MappingProxyType(generations))
+
+def command_changes(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Campi del ventUnit modificati da un payload ``cmd_vent``.
+
+    Il setpoint va sulla chiave del modo (setPointHeating/setPointCooling),
+    che e' quella letta dalle entity.
+    """
+    changes = {"on": payload["on"], "mode": payload["mode"], "fan": payload["fan"]}
+    mode = (payload["mode"] or "").lower()
+    if mode == "heating":
+        changes["setPointHeating"] = payload["setPoint"]
+    elif mode == "cooling":
+        changes["setPointCooling"] = payload["setPoint"]
+    else:
+        changes["setPoint"] = payload["setPoint"]
+    return changes
+
+def clamp_setpoint(value: float, v: Mapping[str, Any], mode: str) -> float:
+    """Limita il setpoint ai min/max che la unit riporta per ``mode``."""
+    if mode == "heating":
+        mn, mx = v.get("setPointHeatingMin"), v.get("setPointHeatingMax")
+    elif mode == "cooling":
+        mn, mx = v.get("setPointCoolingMin"), v.get("setPointCoolingMax")
+    else:
+        mn, mx = v.get("setPointHeatingMin"), v.get("setPointCoolingMax")
+    try:
+        if mn is not None: value = max(value, float(mn))
+        if mx is not None: value = min(value, float(mx))
+    except Exception:
+        pass
+    return value
+
+class SabianaCoordinator(DataUpdateCoordinator[SabianaSnapshot]):
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         self.hass = hass
@@ -32,8 +131,8 @@ class SabianaCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         api_key = entry.data[CONF_API_KEY]
         base_url = entry.data.get(CONF_BASE_URL, DEFAULT_BASE_URL)
 
-        session = async_get_clientsession(hass)
-        self.client = SabianaApiClient(session=session, base_url=base_url, api_key=api_key)
+        self.client = SabianaApiClient(session=None, base_url=base_url, api_key=api_key,
+                                       cache_ttl=GET_CACHE_TTL)
 
         scan = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
@@ -45,15 +144,50 @@ class SabianaCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         )
 
 
-        self.data = {"groups": [], "units": []}
+        self.data = SabianaSnapshot()
         self._pending: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
 
     def mark_pending(self, group_id: Any, address: Any, desired: Dict[str, Any]) -> None:
-        self._pending[_unit_key(group_id, address)] = {
+        key = _unit_key(group_id, address)
+        prev = self._pending.get(key)
+        self._pending[key] = {
             "since_ms": int(time.time() * 1000),
-            "desired": desired,
+            "desired": {**prev["desired"], **desired} if prev else dict(desired),
         }
 
+    @callback
+    def async_apply_optimistic(self, group_id: Any, address: Any, changes: Dict[str, Any]) -> None:
+        """Pubblica un nuovo snapshot con l'aggiornamento ottimistico di una unit.
+
+        Le modifiche restano pending finche' il cloud non riporta un
+        ``lastUpdate`` successivo: un polling con dati precedenti al comando
+        (anche se condiviso con una GET gia' in volo) le riapplica.
+        """
+        self.mark_pending(group_id, address, changes)
+        snapshot = self.data.with_unit_changes(group_id, address, changes)
+        if snapshot is self.data:
+            return
+        self.data = snapshot
+        self.async_update_listeners()
+
+    def _build_snapshot(self, groups: List[Dict[str, Any]], units: List[Dict[str, Any]]) -> SabianaSnapshot:
+        """Nuovo snapshot che riusa le unit identiche a quelle dello snapshot corrente."""
+        prev = self.data
+        generation = prev.generation + 1
+        shared: List[UnitView] = []
+        generations: Dict[Tuple[Any, Any], int] = {}
+        for u in units:
+            gid, addr = u.get("groupId"), u.get("address")
+            old = prev.unit(gid, addr)
+            frozen = _freeze(u)
+            if old is not None and old == frozen:
+                shared.append(old)
+                generations[_unit_key(gid, addr)] = prev.unit_generation(gid, addr)
+            else:
+                shared.append(frozen)
+                generations[_unit_key(gid, addr)] = generation
+        return SabianaSnapshot.build(generation, _freeze(groups or ()), tuple(shared), generations)
+
     def _apply_pending_guard(self, units: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         merged: List[Dict[str, Any]] = []
         to_clear: List[Tuple[Any, Any]] = []
@@ -90,7 +224,7 @@ class SabianaCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
 
         return merged
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    async def _async_update_data(self) -> SabianaSnapshot:
         """Scarica i dati reali da /api/v1/vent, normalizza e applica il pending-guard."""
         try:
             groups = await self.client.list_vent()
@@ -118,4 +252,20 @@ class SabianaCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
                 })
         units = self._apply_pending_guard(units)
 
-        return {"groups": groups, "units": units}
+        return self._build_snapshot(groups, units)
+
+class SabianaUnitEntity(CoordinatorEntity[SabianaCoordinator]):
+    """Entity legata a una unit: scrive lo stato solo se la sua generation cambia."""
+
+    def __init__(self, coordinator: SabianaCoordinator, group_id: Any, address: Any) -> None:
+        super().__init__(coordinator)
+        self._unit_key = _unit_key(group_id, address)
+        self._seen: Optional[Tuple[int, bool]] = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        seen = (self.coordinator.data.unit_generation(*self._unit_key), self.coordinator.last_update_success)
+        if seen == self._seen:
+            return
+        self._seen = seen
+        super()._handle_coordinator_update()
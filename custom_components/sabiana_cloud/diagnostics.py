@@ -4,6 +4,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN
+from .coordinator import thaw
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
@@ -19,6 +20,7 @@ async def async_get_config_entry_diagnostics(
             "version": entry.version,
         },
         "coordinator_last_update_success": coordinator.last_update_success,
-        "units": coordinator.data.get("units"),
-        "groups": coordinator.data.get("groups"),
+        "generation": coordinator.data.generation,
+        "units": thaw(coordinator.data.units),
+        "groups": thaw(coordinator.data.groups),
     }
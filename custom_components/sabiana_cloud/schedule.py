@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .api import SabianaApiError
+from .const import DOMAIN
+from .coordinator import SabianaCoordinator, clamp_setpoint, command_changes
+
+_LOGGER = logging.getLogger(__name__)
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+SETPOINT_TOLERANCE = 0.05
+
+STEP_SCHEMA = vol.Schema({
+    vol.Required("at"): cv.time,
+    vol.Optional("on"): cv.boolean,
+    vol.Optional("mode"): vol.In(["heating", "cooling", "auto", "ventilate"]),
+    vol.Optional("fan"): vol.In(["auto", "V1", "V2", "V3"]),
+    vol.Optional("setPoint"): vol.Coerce(float),
+})
+
+PROGRAM_SCHEMA = vol.Schema({
+    vol.Optional("groups", default=[]): [cv.string],
+    vol.Optional("units", default=[]): [cv.string],
+    vol.Required("week"): {vol.In(WEEKDAYS): [STEP_SCHEMA]},
+})
+
+
+def validate_program(program: Any) -> Dict[str, Any]:
+    """Valida un programma settimanale; solleva ``vol.Invalid`` se non valido."""
+    program = PROGRAM_SCHEMA(program)
+    if not program["groups"] and not program["units"]:
+        raise vol.Invalid("il programma deve indicare almeno un gruppo o una unit")
+    return program
+
+
+# (target_kind, target_id, desired) con target_kind "group" o "unit"
+_Entry = Tuple[str, str, Dict[str, Any]]
+
+
+def _setpoint_for_mode(v: Dict[str, Any], mode: str) -> Optional[float]:
+    if mode == "heating":
+        return v.get("setPointHeating")
+    if mode == "cooling":
+        return v.get("setPointCooling")
+    return v.get("setPoint") or v.get("setPointAutoMode")
+
+
+def _target(v: Dict[str, Any], desired: Dict[str, Any]) -> Dict[str, Any]:
+    """Target effettivo: il setpoint programmato e' limitato ai min/max della unit, come in climate."""
+    if "setPoint" not in desired:
+        return desired
+    mode = (desired.get("mode") or v.get("mode") or "").lower()
+    return {**desired, "setPoint": clamp_setpoint(desired["setPoint"], v, mode)}
+
+
+def _differs(v: Dict[str, Any], desired: Dict[str, Any]) -> bool:
+    """True se lo stato attuale della unit non corrisponde al target del programma."""
+    if "on" in desired and bool(v.get("on")) != desired["on"]:
+        return True
+    if not desired.get("on", bool(v.get("on"))):
+        # unit spenta e da lasciare spenta: modo, fan e setpoint sono irrilevanti
+        return False
+    mode = desired.get("mode") or (v.get("mode") or "").lower()
+    if "mode" in desired and (v.get("mode") or "").lower() != desired["mode"]:
+        return True
+    if "fan" in desired and v.get("fan") != desired["fan"]:
+        return True
+    if "setPoint" in desired:
+        current = _setpoint_for_mode(v, mode)
+        try:
+            return current is None or abs(float(current) - desired["setPoint"]) > SETPOINT_TOLERANCE
+        except (TypeError, ValueError):
+            return True
+    return False
+
+
+def _payload(v: Dict[str, Any], desired: Dict[str, Any]) -> Dict[str, Any]:
+    mode = desired.get("mode") or v.get("mode") or "auto"
+    return {
+        "on": desired.get("on", v.get("on", True)),
+        "mode": mode,
+        "fan": desired.get("fan") or v.get("fan") or "auto",
+        "setPoint": desired.get("setPoint") or _setpoint_for_mode(v, mode.lower()) or v.get("setPoint") or 22.0,
+    }
+
+
+def parse_programs(raw: Dict[str, Any]) -> Dict[int, List[Tuple[time, List[_Entry]]]]:
+    """Compila i programmi settimanali in transizioni ordinate per giorno della settimana.
+
+    Le transizioni allo stesso orario sono raggruppate in un'unica voce, cosi'
+    lo scheduler si sveglia una sola volta per tutte le unit coinvolte.
+    """
+    by_day: Dict[int, Dict[time, List[_Entry]]] = {i: {} for i in range(7)}
+    for name, program in (raw or {}).items():
+        try:
+            program = validate_program(program)
+        except vol.Invalid as e:
+            _LOGGER.error("Programma '%s' non valido, ignorato: %s", name, e)
+            continue
+        targets = [("group", g) for g in program["groups"]] + [("unit", u) for u in program["units"]]
+        for day, steps in program["week"].items():
+            slots = by_day[WEEKDAYS.index(day)]
+            for step in steps:
+                at = step["at"].replace(second=0, microsecond=0)
+                desired = {k: v for k, v in step.items() if k != "at"}
+                for kind, target in targets:
+                    slots.setdefault(at, []).append((kind, target, desired))
+    return {day: sorted(slots.items()) for day, slots in by_day.items()}
+
+
+class SabianaScheduler:
+    """Esegue i programmi settimanali inviando solo le transizioni necessarie.
+
+    Un solo timer e' armato sulla prossima transizione; allo scatto vengono
+    confrontati i target con lo snapshot corrente del coordinator e
+    ``cmd_vent`` viene inviato, in parallelo, solo alle unit che differiscono.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: SabianaCoordinator, programs: Dict[str, Any]) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self._transitions = parse_programs(programs)
+        self._unsub: Optional[Callable[[], None]] = None
+        self._next: Optional[datetime] = None
+
+    @property
+    def next_transition(self) -> Optional[datetime]:
+        return self._next
+
+    @callback
+    def async_start(self) -> None:
+        self._schedule_after(dt_util.now())
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+        self._next = None
+
+    def _next_after(self, after: datetime) -> Optional[Tuple[datetime, List[_Entry]]]:
+        local = dt_util.as_local(after)
+        for offset in range(8):
+            day: date = local.date() + timedelta(days=offset)
+            for at, entries in self._transitions[day.weekday()]:
+                when = datetime.combine(day, at, tzinfo=local.tzinfo)
+                if when > local:
+                    return when, entries
+        return None
+
+    @callback
+    def _schedule_after(self, after: datetime) -> None:
+        nxt = self._next_after(after)
+        if nxt is None:
+            self._next = None
+            return
+        when, entries = nxt
+        self._next = when
+
+        @callback
+        def _fire(_now: datetime) -> None:
+            self._unsub = None
+            self._schedule_after(when)
+            # task legato alla config entry: annullato se l'entry viene scaricata o ricaricata
+            self.coordinator.entry.async_create_background_task(
+                self.hass, self._async_run(entries), f"{DOMAIN} schedule transition"
+            )
+
+        self._unsub = async_track_point_in_time(self.hass, _fire, when)
+
+    def _resolve(self, entries: List[_Entry]) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+        """Target per unit: i campi dei programmi per unit si sovrappongono a quelli per gruppo."""
+        units = self.coordinator.data.units
+        targets: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        for kind in ("group", "unit"):
+            for entry_kind, target, desired in entries:
+                if entry_kind != kind:
+                    continue
+                field = "groupId" if kind == "group" else "address"
+                for u in units:
+                    if str(u.get(field)) == target:
+                        key = (u.get("groupId"), u.get("address"))
+                        targets[key] = {**targets.get(key, {}), **desired}
+        return targets
+
+    async def _async_run(self, entries: List[_Entry]) -> None:
+        snapshot = self.coordinator.data
+        commands: List[Tuple[Any, Dict[str, Any]]] = []
+        for (gid, addr), desired in self._resolve(entries).items():
+            unit = snapshot.unit(gid, addr)
+            v = (unit or {}).get("ventUnit") or {}
+            desired = _target(v, desired)
+            if not _differs(v, desired):
+                continue
+            payload = _payload(v, desired)
+            self.coordinator.async_apply_optimistic(gid, addr, command_changes(payload))
+            commands.append((addr, payload))
+
+        if not commands:
+            _LOGGER.debug("Transizione programmata: tutte le unit gia' allineate")
+            return
+
+        _LOGGER.debug("Transizione programmata: invio %d comandi", len(commands))
+        results = await asyncio.gather(
+            *(self.coordinator.client.cmd_vent(addr, payload) for addr, payload in commands),
+            return_exceptions=True,
+        )
+        for (addr, _), res in zip(commands, results):
+            if isinstance(res, SabianaApiError):
+                _LOGGER.warning("Comando programmato per %s fallito: %s", addr, res)
+            elif isinstance(res, Exception):
+                _LOGGER.exception("Errore inatteso nel comando programmato per %s", addr, exc_info=res)
+        await self.coordinator.async_request_refresh()
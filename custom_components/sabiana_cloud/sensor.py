@@ -1,9 +1,8 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, List
 from datetime import datetime, timezone
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorDeviceClass,
@@ -12,7 +11,7 @@ from homeassistant.components.sensor import (
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.const import UnitOfTemperature
 from .const import DOMAIN
-from .coordinator import SabianaCoordinator
+from .coordinator import SabianaCoordinator, SabianaUnitEntity, UnitView
 
 
 SENSORS_MAIN = {
@@ -59,7 +58,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     coordinator: SabianaCoordinator = hass.data[DOMAIN][entry.entry_id]
     entities: List[SensorEntity] = []
 
-    for u in coordinator.data.get("units", []):
+    for u in coordinator.data.units:
         gid = u["groupId"]
         addr = u["address"]
         name = u.get("name") or addr
@@ -113,7 +112,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     async_add_entities(entities)
 
 
-class SabianaSimpleSensor(CoordinatorEntity, SensorEntity):
+class SabianaSimpleSensor(SabianaUnitEntity, SensorEntity):
     def __init__(
         self,
         coordinator: SabianaCoordinator,
@@ -126,7 +125,7 @@ class SabianaSimpleSensor(CoordinatorEntity, SensorEntity):
         enabled_default: bool = True,
         diagnostic: bool = False,
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, gid, addr)
         self._gid = gid
         self._addr = addr
         self._key = key
@@ -158,11 +157,8 @@ class SabianaSimpleSensor(CoordinatorEntity, SensorEntity):
         if key == "lastUpdate":
             self._attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def _current(self) -> Dict[str, Any] | None:
-        for u in self.coordinator.data.get("units", []):
-            if u.get("groupId") == self._gid and u.get("address") == self._addr:
-                return u
-        return None
+    def _current(self) -> UnitView | None:
+        return self.coordinator.data.unit(self._gid, self._addr)
 
     @property
     def native_value(self):
@@ -0,0 +1,217 @@
+"""Benchmark locale della sessione HTTP usata verso Sabiana Cloud.
+
+Confronta, con richieste distanziate come il polling del coordinator, la
+configurazione del pool della sessione condivisa di HA ("before") con la
+sessione dedicata di ``api.create_session`` ("after"). Entrambe parlano con
+lo stesso server HTTPS locale (aiohttp, keep-alive lato server 75 s) tramite
+un proxy TCP per configurazione che conta i byte sul filo.
+
+Richiede homeassistant installato. Uso:
+
+    python scripts/bench_http.py --interval 30 --requests 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import functools
+import ipaddress
+import json
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig, web
+from aiohttp.hdrs import USER_AGENT
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from custom_components.sabiana_cloud import api  # noqa: E402
+
+# limiti del connector condiviso di HA (helpers/aiohttp_client.py)
+HA_MAXIMUM_CONNECTIONS = 4096
+HA_MAXIMUM_CONNECTIONS_PER_HOST = 100
+
+
+def _payload() -> List[Dict[str, Any]]:
+    """Risposta di /api/v1/vent con 4 gruppi da 10 fan-coil."""
+    vent = {
+        "on": True, "mode": "heating", "fan": "auto", "t1": 21.3, "t3": 45.2,
+        "setPointHeating": 21.0, "setPointCooling": 25.0,
+        "setPointHeatingMin": 5, "setPointHeatingMax": 30,
+        "setPointCoolingMin": 16, "setPointCoolingMax": 32,
+        "activeAlarms": [], "withActiveAlarms": False,
+        "lockAllFeatures": False, "lockOnOff": False, "lockMode": False, "lockSet": False, "lockFan": False,
+    }
+    return [{"groupId": g, "groupName": f"Piano {g}", "units": [
+        {"unitType": "VentUnit", "name": f"Room {g}{i}", "address": f"{g:02X}{i:02X}",
+         "lastUpdate": 1760000000000, "controllerType": "5003", "ventUnit": dict(vent)}
+        for i in range(10)]} for g in range(4)]
+
+
+def _self_signed(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class CountingProxy:
+    """Proxy TCP che conta connessioni e byte nei due versi."""
+
+    def __init__(self, upstream_port: int) -> None:
+        self.upstream_port = upstream_port
+        self.conns = 0
+        self.tx = 0
+        self.rx = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.conns += 1
+        up_reader, up_writer = await asyncio.open_connection("127.0.0.1", self.upstream_port)
+
+        async def pipe(src: asyncio.StreamReader, dst: asyncio.StreamWriter, upstream: bool) -> None:
+            try:
+                while data := await src.read(65536):
+                    if upstream:
+                        self.tx += len(data)
+                    else:
+                        self.rx += len(data)
+                    dst.write(data)
+                    await dst.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                dst.close()
+
+        try:
+            await asyncio.gather(pipe(reader, up_writer, True), pipe(up_reader, writer, False))
+        except asyncio.CancelledError:
+            pass
+
+
+def _shared_like_session(trace: TraceConfig) -> ClientSession:
+    """Pool con i parametri della sessione condivisa di HA (keep-alive aiohttp: 15 s)."""
+    connector = TCPConnector(
+        ssl=api.get_default_context(),
+        limit=HA_MAXIMUM_CONNECTIONS,
+        limit_per_host=HA_MAXIMUM_CONNECTIONS_PER_HOST,
+    )
+    return ClientSession(connector=connector, json_serialize=json_dumps,
+                         headers={USER_AGENT: SERVER_SOFTWARE}, trace_configs=[trace])
+
+
+def _dedicated_session(trace: TraceConfig) -> ClientSession:
+    session_cls = api.ClientSession
+    api.ClientSession = functools.partial(session_cls, trace_configs=[trace])
+    try:
+        return api.create_session()
+    finally:
+        api.ClientSession = session_cls
+
+
+async def _run(label: str, make_session, port: int, proxy: CountingProxy, args) -> Dict[str, Any]:
+    ttfb: List[float] = []
+    trace = TraceConfig()
+
+    async def on_start(_session, ctx, _params) -> None:
+        ctx.start = time.perf_counter()
+
+    async def on_end(_session, ctx, _params) -> None:
+        ttfb.append((time.perf_counter() - ctx.start) * 1000)
+
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    session = make_session(trace)
+    client = api.SabianaApiClient(session, f"https://localhost:{port}", "bench-key")
+    try:
+        for i in range(args.requests):
+            if i:
+                await asyncio.sleep(args.interval)
+            await client.list_vent()
+    finally:
+        await session.close()
+    return {
+        "config": label,
+        "connections": proxy.conns,
+        "bytes_per_request": round((proxy.tx + proxy.rx) / args.requests),
+        "rx_bytes_per_request": round(proxy.rx / args.requests),
+        "ttfb_first_ms": round(ttfb[0], 2),
+        "ttfb_p50_ms": round(statistics.median(ttfb[1:] or ttfb), 2),
+        "ttfb_max_ms": round(max(ttfb[1:] or ttfb), 2),
+    }
+
+
+async def main(args) -> None:
+    body = json.dumps(_payload()).encode()
+
+    async def vent(request: web.Request) -> web.Response:
+        resp = web.Response(body=body, content_type="application/json")
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            resp.enable_compression()
+        return resp
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _self_signed(Path(tmp))
+        server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_ctx.load_cert_chain(cert, key)
+        # le sessioni usano il contesto SSL di HA, qui esteso per fidarsi del certificato di test
+        client_ctx = ssl.create_default_context(cafile=str(cert))
+        api.get_default_context = lambda: client_ctx
+
+        app = web.Application()
+        app.router.add_get("/api/v1/vent", vent)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ctx)
+        await site.start()
+        upstream = site._server.sockets[0].getsockname()[1]
+
+        configs = [("before: shared HA pool", _shared_like_session),
+                   ("after: dedicated session", _dedicated_session)]
+        runs = []
+        for label, factory in configs:
+            proxy = CountingProxy(upstream)
+            server = await asyncio.start_server(proxy.handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            runs.append((server, _run(label, factory, port, proxy, args)))
+
+        print(f"payload {len(body)} B JSON, {args.requests} requests every {args.interval:g} s")
+        results = await asyncio.gather(*(run for _, run in runs))
+        for server, _ in runs:
+            server.close()
+        await runner.cleanup()
+
+    for r in results:
+        print(f"{r['config']:26s} conns={r['connections']:3d} bytes/req={r['bytes_per_request']:6d} "
+              f"(rx {r['rx_bytes_per_request']:6d})  TTFB first={r['ttfb_first_ms']:6.2f} ms "
+              f"p50={r['ttfb_p50_ms']:6.2f} ms max={r['ttfb_max_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interval", type=float, default=30.0, help="secondi tra le richieste (scan interval)")
+    parser.add_argument("--requests", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,118 @@
+from datetime import datetime, time
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.sabiana_cloud.coordinator import SabianaSnapshot
+from custom_components.sabiana_cloud.schedule import (
+    SabianaScheduler,
+    _differs,
+    _payload,
+    _target,
+    parse_programs,
+)
+
+ROME = ZoneInfo("Europe/Rome")
+
+PROGRAMS = {
+    "living": {
+        "groups": [12],
+        "week": {
+            "mon": [
+                {"at": "06:30", "on": True, "mode": "heating", "setPoint": 21},
+                {"at": "22:00", "on": False},
+            ],
+        },
+    },
+    "studio": {
+        "units": ["0A1B"],
+        "week": {"mon": [{"at": "06:30", "setPoint": 19, "fan": "V1"}]},
+    },
+}
+
+
+@pytest.fixture
+def rome_tz():
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(ROME)
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+def _scheduler(programs, units=()):
+    snapshot = SabianaSnapshot.build(1, (), tuple(units), {})
+    return SabianaScheduler(None, SimpleNamespace(data=snapshot), programs)
+
+
+def test_parse_programs_groups_slots_and_skips_invalid():
+    transitions = parse_programs({**PROGRAMS, "bad": {"week": {"xx": []}}, "empty": {"week": {"mon": []}}})
+
+    assert [at for at, _ in transitions[0]] == [time(6, 30), time(22, 0)]
+    assert transitions[0][0][1] == [
+        ("group", "12", {"on": True, "mode": "heating", "setPoint": 21.0}),
+        ("unit", "0A1B", {"setPoint": 19.0, "fan": "V1"}),
+    ]
+    assert all(transitions[day] == [] for day in range(1, 7))
+
+
+def test_resolve_layers_unit_fields_over_group_fields():
+    units = [
+        {"groupId": 12, "address": "0A1B", "ventUnit": {}},
+        {"groupId": 12, "address": "0A1C", "ventUnit": {}},
+        {"groupId": 7, "address": "0B00", "ventUnit": {}},
+    ]
+    scheduler = _scheduler(PROGRAMS, units)
+    entries = scheduler._transitions[0][0][1]
+
+    assert scheduler._resolve(entries) == {
+        (12, "0A1B"): {"on": True, "mode": "heating", "setPoint": 19.0, "fan": "V1"},
+        (12, "0A1C"): {"on": True, "mode": "heating", "setPoint": 21.0},
+    }
+
+
+def test_differs_turns_on_unit_switched_off_by_group():
+    v = {"on": False, "mode": "heating", "setPointHeating": 19.0}
+    assert _differs(v, {"on": True, "mode": "heating", "setPoint": 19.0, "fan": "V1"})
+
+
+def test_differs_ignores_settings_of_unit_left_off():
+    assert not _differs({"on": False, "mode": "cooling"}, {"on": False})
+    assert not _differs({"on": False, "mode": "cooling"}, {"mode": "heating"})
+
+
+def test_differs_compares_setpoint_of_target_mode():
+    v = {"on": True, "mode": "heating", "fan": "auto", "setPointHeating": 21.0, "setPointCooling": 25.0}
+    assert not _differs(v, {"on": True, "mode": "heating", "setPoint": 21.02})
+    assert _differs(v, {"setPoint": 22})
+    assert _differs(v, {"mode": "cooling", "setPoint": 21})
+    assert not _differs(v, {"mode": "heating", "fan": "auto"})
+    assert _differs(v, {"fan": "V3"})
+
+
+def test_target_clamps_setpoint_like_climate():
+    v = {"on": True, "mode": "heating", "setPointHeating": 30.0, "setPointHeatingMax": 30, "setPointCoolingMin": 16}
+    assert _target(v, {"setPoint": 35.0}) == {"setPoint": 30.0}
+    assert _target(v, {"mode": "cooling", "setPoint": 10.0}) == {"mode": "cooling", "setPoint": 16.0}
+    assert _target(v, {"on": False}) == {"on": False}
+    # una unit che ha gia' limitato il valore non viene ricomandata ad ogni transizione
+    assert not _differs(v, _target(v, {"setPoint": 35.0}))
+    assert _payload(v, _target(v, {"setPoint": 35.0}))["setPoint"] == 30.0
+
+
+def test_next_after_same_day_next_week_and_dst(rome_tz):
+    scheduler = _scheduler(PROGRAMS)
+
+    when, entries = scheduler._next_after(datetime(2026, 10, 19, 7, 0, tzinfo=ROME))
+    assert when == datetime(2026, 10, 19, 22, 0, tzinfo=ROME)
+    assert entries == [("group", "12", {"on": False})]
+
+    # dopo l'ultima transizione del lunedi' si passa al lunedi' successivo, dopo il cambio d'ora
+    when, _ = scheduler._next_after(datetime(2026, 10, 19, 22, 0, tzinfo=ROME))
+    assert when == datetime(2026, 10, 26, 6, 30, tzinfo=ROME)
+    assert when.utcoffset().total_seconds() == 3600
+
+
+def test_next_after_without_programs():
+    assert _scheduler({})._next_after(dt_util.utcnow()) is None